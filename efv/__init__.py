@@ -7,6 +7,6 @@ __version__ = "1.0.0"
 __author__ = "Osama Abdelkader"
 __email__ = "osama.abdelkader@gmail.com"
 
-from .analyzer import FilesystemAnalyzer
+from .analyzer import FilesystemAnalyzer, FileStat, format_size
 
-__all__ = ["FilesystemAnalyzer"] 
\ No newline at end of file
+__all__ = ["FilesystemAnalyzer", "FileStat", "format_size"] 
\ No newline at end of file
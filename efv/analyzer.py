@@ -3,11 +3,20 @@ Filesystem analyzer module for EFV.
 """
 
 import os
+import re
+import sys
 import stat
 import time
+import array
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from collections import defaultdict, Counter
-from typing import Dict, List, Tuple, Optional
+from collections import Counter, deque
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple, Optional
+import numpy as np
 import psutil
 from rich.console import Console
 from rich.table import Table
@@ -15,22 +24,396 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 import colorama
 from colorama import Fore, Back, Style
+from .cache import HeaderCache
 
-# Initialize colorama for cross-platform colored output
-colorama.init()
+try:
+    # Optional multi-threaded C implementation of os.walk()
+    from pwalk import walk as _fastwalk
+except ImportError:
+    _fastwalk = None
+
+# Initialize colorama for cross-platform colored output; when stdout is
+# redirected there is nothing to colour and its stream wrapper is pure overhead
+if sys.stdout is not None and sys.stdout.isatty():
+    colorama.init()
+
+# Number of directory scanner threads used by default
+DEFAULT_SCAN_THREADS = 32
+
+# Files not modified for this many seconds are reported as old
+OLD_FILE_AGE = 365 * 24 * 3600
+
+# Where supported, directories are scanned through an open descriptor so
+# each file is stat'ed with fstatat() relative to it
+_SCANDIR_FD = os.scandir in os.supports_fd
+_DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+
+# File name patterns of init and startup scripts
+_INIT_SCRIPT_RE = re.compile(r'init|rc|startup|boot|systemd|upstart|sysvinit|systemctl')
+
+# Files that are never checked for a shebang line
+_BINARY_SUFFIXES = ('.so', '.o', '.ko', '.a', '.bin')
+_SHEBANG_MAX_SIZE = 1024 * 1024
+
+# Bytes read from the start of a file to classify it
+_HEADER_SIZE = 128
+
+# The numba kernels only pay off on very large trees: below this many files
+# importing numba and loading the compiled kernels costs more than the
+# vectorized NumPy versions take
+_NUMBA_MIN_FILES = 10_000_000
+
+# Files converted to Python objects at a time by iter_file_stats()
+_RECORD_CHUNK = 4096
+
+
+class _ScanQueue:
+    """LIFO queue of directories shared by the scanner threads."""
+    
+    def __init__(self, root: str):
+        self._dirs = deque([root])
+        self._pending = 1  # queued + currently being scanned
+        self._cancelled = False
+        self._cond = threading.Condition()
+    
+    def get(self) -> Optional[str]:
+        """Pop the next directory, or return None once the walk is finished."""
+        with self._cond:
+            while not self._dirs and self._pending and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled or not self._dirs:
+                return None
+            return self._dirs.pop()
+    
+    def cancel(self):
+        """Stop the walk; every scanner returns after its current directory."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+    
+    def task_done(self, subdirs: List[str]):
+        """Mark a directory as scanned and queue its subdirectories."""
+        with self._cond:
+            self._dirs.extend(subdirs)
+            self._pending += len(subdirs) - 1
+            if self._pending:
+                self._cond.notify(len(subdirs))
+            else:
+                self._cond.notify_all()
+
+
+class _FileStatBuffer:
+    """Packed per-file stat buffers filled by a single scanner thread.
+
+    Files are stored as a name plus an index into a table of directories.
+    """
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self.dir_ids = array.array('I')
+        self.sizes = array.array('q')
+        self.modes = array.array('I')
+        self.mtimes = array.array('d')
+        self.uids = array.array('I')
+        self.gids = array.array('I')
+        self.inodes = array.array('Q')
+        self.dirs: List[str] = []  # directories holding at least one file
+        self.dir_sizes = array.array('q')  # size of the files directly inside
+        self.suffixes = Counter()  # as found on disk, not case-folded
+        self.no_suffix: List[int] = []  # indices into names
+        self._dir = ''
+        self._dir_start = 0
+        self._dir_size = 0
+        self._dir_suffixes: List[str] = []
+    
+    def start_directory(self, directory: str):
+        """Begin recording the files of a directory."""
+        self._dir = directory
+        self._dir_start = len(self.names)
+        self._dir_size = 0
+    
+    def append(self, name: str, stat_info: os.stat_result):
+        """Record a file of the current directory."""
+        # One tuple unpack instead of several attribute lookups; the tuple
+        # form truncates mtime to whole seconds, so it is read separately
+        mode, ino, _dev, _nlink, uid, gid, size = stat_info[:7]
+        mtime = stat_info.st_mtime
+        self.names.append(name)
+        self.dir_ids.append(len(self.dirs))
+        self.sizes.append(size)
+        self.modes.append(mode)
+        self.mtimes.append(mtime)
+        self.uids.append(uid)
+        self.gids.append(gid)
+        self.inodes.append(ino)
+        self._dir_size += size
+        
+        # Same rules as Path.suffix; counted per directory in finish_directory()
+        dot = name.rfind('.')
+        if 0 < dot < len(name) - 1:
+            self._dir_suffixes.append(name[dot:])
+        else:
+            self.no_suffix.append(len(self.names) - 1)
+    
+    def finish_directory(self):
+        """Finish the current directory, keeping it only if it held files."""
+        if len(self.names) == self._dir_start:
+            return
+        self.dirs.append(self._dir)
+        self.dir_sizes.append(self._dir_size)
+        
+        # Counter.update() tallies a whole list in C
+        self.suffixes.update(self._dir_suffixes)
+        self._dir_suffixes.clear()
+    
+    def extend(self, other: "_FileStatBuffer"):
+        file_offset = len(self.names)
+        dir_offset = len(self.dirs)
+        self.names.extend(other.names)
+        dir_ids = np.frombuffer(other.dir_ids, dtype=other.dir_ids.typecode) + dir_offset
+        self.dir_ids.frombytes(dir_ids.astype(other.dir_ids.typecode).tobytes())
+        self.sizes.extend(other.sizes)
+        self.modes.extend(other.modes)
+        self.mtimes.extend(other.mtimes)
+        self.uids.extend(other.uids)
+        self.gids.extend(other.gids)
+        self.inodes.extend(other.inodes)
+        self.dirs.extend(other.dirs)
+        self.dir_sizes.extend(other.dir_sizes)
+        self.suffixes.update(other.suffixes)
+        self.no_suffix.extend(i + file_offset for i in other.no_suffix)
+
+
+# Loops compiled with numba by _jit_kernel() for very large trees
+
+
+def _nb_top_k_indices(sizes, k):
+    n = sizes.shape[0]
+    k = min(k, n)
+    top = np.empty(k, dtype=np.int64)
+    if k == 0:
+        return top
+    count = 0
+    for i in range(n):
+        size = sizes[i]
+        if count == k:
+            if size <= sizes[top[k - 1]]:
+                continue
+            pos = k - 1
+        else:
+            pos = count
+            count += 1
+        # Insertion into the small sorted window, largest first
+        while pos > 0 and sizes[top[pos - 1]] < size:
+            top[pos] = top[pos - 1]
+            pos -= 1
+        top[pos] = i
+    return top
+
+
+def _nb_duplicate_waste(sorted_sizes):
+    n = sorted_sizes.shape[0]
+    groups = 0
+    waste = 0
+    i = 0
+    while i < n:
+        j = i + 1
+        while j < n and sorted_sizes[j] == sorted_sizes[i]:
+            j += 1
+        if j - i > 1:
+            groups += 1
+            waste += sorted_sizes[i] * (j - i - 1)
+        i = j
+    return groups, waste
+
+
+def _nb_old_file_stats(mtimes, sizes, cutoff):
+    count = 0
+    total = 0
+    for i in range(mtimes.shape[0]):
+        if mtimes[i] < cutoff:
+            count += 1
+            total += sizes[i]
+    return count, total
+
+
+@lru_cache(maxsize=None)
+def _compiled_kernel(kernel):
+    """Return a kernel compiled with numba, or None if numba is not installed."""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(kernel)
+
+
+def _jit_kernel(kernel, n: int):
+    """Return the compiled kernel if n files are enough for it to pay off."""
+    if n < _NUMBA_MIN_FILES:
+        return None
+    return _compiled_kernel(kernel)
+
+
+def _read_header(file_path: str) -> Optional[bytes]:
+    """Read the start of a file, or return None if it cannot be opened.
+
+    Only what the classifiers look at is kept: the shebang line of a
+    script, otherwise the four magic bytes.
+    """
+    try:
+        # Non-blocking so FIFOs and device nodes cannot stall the scan
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_NONBLOCK', 0))
+        try:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, _HEADER_SIZE, os.POSIX_FADV_WILLNEED)
+            header = os.read(fd, _HEADER_SIZE)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+    
+    if header.startswith(b'#!'):
+        return header.split(b'\n', 1)[0]
+    return header[:4]
+
+
+def _shebang_interpreter(header: Optional[bytes]) -> Optional[str]:
+    """Return the interpreter named on a shebang line, if any."""
+    if not header or not header.startswith(b'#!'):
+        return None
+    return header.decode('utf-8', 'replace').strip()[2:]
+
+
+def _top_k_indices(sizes: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k largest sizes, largest first."""
+    kernel = _jit_kernel(_nb_top_k_indices, len(sizes))
+    if kernel is not None:
+        return kernel(sizes, k)
+    
+    # Partial sort: only the top entries need ordering. Partitioning at
+    # n - k finds the k-th largest size without a negated copy of the array
+    n = len(sizes)
+    if n > k:
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+        threshold = sizes[np.argpartition(sizes, n - k)[n - k]]
+        above = np.flatnonzero(sizes > threshold)
+        # Ties at the threshold keep the lowest indices, as in the numba kernel
+        ties = np.flatnonzero(sizes == threshold)[:k - len(above)]
+        idx = np.sort(np.concatenate((above, ties)))
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-sizes[idx], kind='stable')]
+
+
+def _duplicate_waste(sizes: np.ndarray) -> Tuple[int, int]:
+    """Return (groups, wasted bytes) for files sharing the same size."""
+    sorted_sizes = np.sort(sizes)
+    kernel = _jit_kernel(_nb_duplicate_waste, len(sorted_sizes))
+    if kernel is not None:
+        groups, waste = kernel(sorted_sizes)
+        return int(groups), int(waste)
+    
+    if not len(sorted_sizes):
+        return 0, 0
+    
+    # Runs of equal sizes in the sorted array are the duplicate groups
+    boundaries = np.flatnonzero(np.diff(sorted_sizes)) + 1
+    run_starts = np.concatenate(([0], boundaries))
+    run_lens = np.diff(np.concatenate((run_starts, [len(sorted_sizes)])))
+    duplicate = run_lens > 1
+    waste = sorted_sizes[run_starts[duplicate]] * (run_lens[duplicate] - 1)
+    return int(duplicate.sum()), int(waste.sum())
+
+
+def _old_file_stats(mtimes: np.ndarray, sizes: np.ndarray, cutoff: float) -> Tuple[int, int]:
+    """Return (count, total bytes) of files last modified before cutoff."""
+    kernel = _jit_kernel(_nb_old_file_stats, len(mtimes))
+    if kernel is not None:
+        count, total = kernel(mtimes, sizes, cutoff)
+        return int(count), int(total)
+    
+    old_mask = mtimes < cutoff
+    return int(old_mask.sum()), int(sizes[old_mask].sum())
+
+
+@lru_cache(maxsize=4096)
+def format_size(size_bytes: int) -> str:
+    """Format a byte count with a binary unit suffix.
+
+    Reports format the same sizes over and over (empty files, block
+    sized files, repeated directory totals), so results are memoized.
+    """
+    if size_bytes == 0:
+        return "0B"
+    
+    size_names = ["B", "KB", "MB", "GB", "TB"]
+    # Each unit is 2**10 larger, so the unit index follows from the bit length
+    i = min((size_bytes.bit_length() - 1) // 10, len(size_names) - 1)
+    
+    return f"{size_bytes / (1 << (10 * i)):.1f}{size_names[i]}"
+
+
+def _scan_entries(entries, directory: str, buffer: _FileStatBuffer, subdirs: List[str]):
+    """Record the regular files of one scandir iterator and collect its subdirectories."""
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(os.path.join(directory, entry.name))
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat_info = entry.stat(follow_symlinks=False)
+            except (OSError, PermissionError):
+                continue
+            buffer.append(entry.name, stat_info)
+
+
+class FileStat(NamedTuple):
+    """Metadata of a single scanned file."""
+    path: str
+    size: int
+    mode: int
+    mtime: float
+    uid: int
+    gid: int
 
 
 class FilesystemAnalyzer:
     """Analyzes filesystem structure and provides insights."""
     
-    def __init__(self, root_path: str = "/"):
+    def __init__(self, root_path: str = "/", threads: int = DEFAULT_SCAN_THREADS,
+                 use_pwalk: bool = False, cache_dir: Optional[str] = None,
+                 progress_callback: Optional[Callable[[str], None]] = None):
         self.root_path = Path(root_path).resolve()
+        # Every scanned path is built from this string, so it is computed once
+        self._root_str = str(self.root_path)
+        self.threads = max(1, threads)
+        self.use_pwalk = use_pwalk
+        # Called with a status message for each phase and, from the scanner
+        # threads, for each directory; it must be cheap and thread-safe
+        self.progress_callback = progress_callback
         self.console = Console()
-        self.file_stats = {}
+        # Per-file metadata as parallel arrays, indexed like ``names``; the
+        # directory of each file is ``dirs[dir_ids[i]]``
+        self.names: List[str] = []
+        self.dirs: List[str] = []
+        self.dir_ids = np.empty(0, dtype=np.uint32)
+        self.sizes = np.empty(0, dtype=np.int64)
+        self.modes = np.empty(0, dtype=np.uint32)
+        self.mtimes = np.empty(0, dtype=np.float64)
+        self.uids = np.empty(0, dtype=np.uint32)
+        self.gids = np.empty(0, dtype=np.uint32)
+        self.inodes = np.empty(0, dtype=np.uint64)
         self.directory_sizes = {}
         self.init_scripts = []
         self.large_files = []
         self.file_types = Counter()
+        self._no_suffix: List[int] = []
+        self._dir_file_sizes = np.empty(0, dtype=np.int64)
+        # File headers sniffed this run, persisted across runs with a cache_dir
+        self._headers = HeaderCache(self._root_str, cache_dir)
         
     def analyze_filesystem(self) -> Dict:
         """Perform comprehensive filesystem analysis."""
@@ -39,156 +422,317 @@ class FilesystemAnalyzer:
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=self.console
+            console=self.console,
+            disable=not self.console.is_terminal
         ) as progress:
             task = progress.add_task("Scanning filesystem...", total=None)
             
+            def set_status(description):
+                progress.update(task, description=description)
+                self._report_progress(description)
+            
             # Collect file statistics
+            self._report_progress("Scanning filesystem...")
             self._collect_file_stats()
-            progress.update(task, description="Analyzing file types...")
+            set_status("Analyzing file types...")
             
             # Analyze file types
             self._analyze_file_types()
-            progress.update(task, description="Finding init scripts...")
+            set_status("Finding init scripts...")
             
             # Find init scripts
             self._find_init_scripts()
-            progress.update(task, description="Calculating directory sizes...")
+            set_status("Calculating directory sizes...")
             
             # Calculate directory sizes
             self._calculate_directory_sizes()
-            progress.update(task, description="Finding large files...")
+            set_status("Finding large files...")
             
             # Find large files
             self._find_large_files()
-            
+        
+        try:
+            self._headers.save()
+        except OSError as e:
+            self.console.print(f"[yellow]Warning: Could not save header cache: {e}[/yellow]")
+        
         return self._generate_report()
     
+    def _report_progress(self, message: str):
+        """Pass a status message to the progress callback, if any."""
+        if self.progress_callback is not None:
+            self.progress_callback(message)
+    
+    @property
+    def paths(self) -> List[str]:
+        """Full path of every file, built on demand from the directory table."""
+        dirs = self.dirs
+        join = os.path.join
+        return [join(dirs[d], name) for d, name in zip(self.dir_ids.tolist(), self.names)]
+    
+    def _file_path(self, i: int) -> str:
+        """Return the full path of the i-th file."""
+        return os.path.join(self.dirs[self.dir_ids[i]], self.names[i])
+    
+    def iter_file_stats(self) -> Iterator[FileStat]:
+        """Yield one FileStat record per scanned file.
+
+        The metadata itself stays in the parallel arrays. Records are built
+        a fixed-size chunk at a time, so memory use does not grow with the
+        number of files.
+        """
+        dirs = self.dirs
+        join = os.path.join
+        for start in range(0, len(self.names), _RECORD_CHUNK):
+            stop = start + _RECORD_CHUNK
+            paths = [
+                join(dirs[d], name)
+                for d, name in zip(self.dir_ids[start:stop].tolist(), self.names[start:stop])
+            ]
+            yield from map(FileStat._make, zip(
+                paths,
+                self.sizes[start:stop].tolist(),
+                self.modes[start:stop].tolist(),
+                self.mtimes[start:stop].tolist(),
+                self.uids[start:stop].tolist(),
+                self.gids[start:stop].tolist()
+            ))
+    
     def _collect_file_stats(self):
         """Collect basic file statistics."""
-        for root, dirs, files in os.walk(self.root_path):
-            try:
-                for file in files:
-                    file_path = Path(root) / file
-                    try:
-                        stat_info = file_path.stat()
-                        self.file_stats[str(file_path)] = {
-                            'size': stat_info.st_size,
-                            'mode': stat_info.st_mode,
-                            'mtime': stat_info.st_mtime,
-                            'uid': stat_info.st_uid,
-                            'gid': stat_info.st_gid
-                        }
-                    except (OSError, PermissionError):
-                        continue
-            except (OSError, PermissionError):
-                continue
+        if self.use_pwalk and _fastwalk is not None:
+            merged = self._collect_with_pwalk()
+        else:
+            if self.use_pwalk:
+                self.console.print("[yellow]Warning: pwalk is not installed, using the built-in scanner[/yellow]")
+            
+            queue = _ScanQueue(self._root_str)
+            
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                try:
+                    futures = [
+                        executor.submit(self._scan_worker, queue)
+                        for _ in range(self.threads)
+                    ]
+                    
+                    # Wait with a timeout: SIGINT may be taken by a scanner
+                    # thread, and only the main thread raises
+                    # KeyboardInterrupt once it is back in the interpreter
+                    pending = futures
+                    while pending:
+                        _, pending = wait(pending, timeout=0.1)
+                    buffers = [future.result() for future in futures]
+                except BaseException:
+                    # Stop the workers instead of letting the executor wait
+                    # for them to walk the whole tree
+                    queue.cancel()
+                    raise
+            
+            # Merge the thread-local buffers
+            merged = buffers[0]
+            for buffer in buffers[1:]:
+                merged.extend(buffer)
+        
+        # Zero-copy views over the packed buffers
+        self.names = merged.names
+        self.dirs = merged.dirs
+        self.dir_ids = np.frombuffer(merged.dir_ids, dtype=merged.dir_ids.typecode)
+        self.sizes = np.frombuffer(merged.sizes, dtype=merged.sizes.typecode)
+        self.modes = np.frombuffer(merged.modes, dtype=merged.modes.typecode)
+        self.mtimes = np.frombuffer(merged.mtimes, dtype=merged.mtimes.typecode)
+        self.uids = np.frombuffer(merged.uids, dtype=merged.uids.typecode)
+        self.gids = np.frombuffer(merged.gids, dtype=merged.gids.typecode)
+        self.inodes = np.frombuffer(merged.inodes, dtype=merged.inodes.typecode)
+        
+        # Aggregates computed during the walk; case-folding the distinct
+        # suffixes is far cheaper than lowercasing every file name
+        for suffix, count in merged.suffixes.items():
+            self.file_types[suffix.lower()] += count
+        self._no_suffix = merged.no_suffix
+        self._dir_file_sizes = np.frombuffer(merged.dir_sizes, dtype=merged.dir_sizes.typecode)
+    
+    def _collect_with_pwalk(self) -> _FileStatBuffer:
+        """Collect file statistics using pwalk's C directory walker."""
+        buffer = _FileStatBuffer()
+        for root, dirs, files in _fastwalk(self._root_str):
+            self._report_progress(f"Scanning {root}")
+            buffer.start_directory(root)
+            for file in files:
+                try:
+                    stat_info = os.lstat(os.path.join(root, file))
+                except (OSError, PermissionError):
+                    continue
+                if stat.S_ISREG(stat_info.st_mode):
+                    buffer.append(file, stat_info)
+            buffer.finish_directory()
+        return buffer
+    
+    def _scan_worker(self, queue: _ScanQueue) -> _FileStatBuffer:
+        """Scan directories from the shared queue until the walk is finished.
+
+        Only regular files are stat'ed; symlinks and special files are skipped.
+        """
+        buffer = _FileStatBuffer()
+        callback = self.progress_callback
+        try:
+            while True:
+                directory = queue.get()
+                if directory is None:
+                    return buffer
+                
+                if callback is not None:
+                    callback(f"Scanning {directory}")
+                
+                subdirs = []
+                buffer.start_directory(directory)
+                try:
+                    if _SCANDIR_FD:
+                        dir_fd = os.open(directory, _DIR_OPEN_FLAGS)
+                        try:
+                            _scan_entries(os.scandir(dir_fd), directory, buffer, subdirs)
+                        finally:
+                            os.close(dir_fd)
+                    else:
+                        _scan_entries(os.scandir(directory), directory, buffer, subdirs)
+                except (OSError, PermissionError):
+                    pass
+                finally:
+                    buffer.finish_directory()
+                    queue.task_done(subdirs)
+        except BaseException:
+            # An unexpected error leaves this directory unfinished; stop the
+            # other scanners rather than have them wait for it forever
+            queue.cancel()
+            raise
     
     def _analyze_file_types(self):
-        """Analyze file types based on extensions and content."""
-        for file_path in self.file_stats:
-            path = Path(file_path)
-            if path.suffix:
-                self.file_types[path.suffix.lower()] += 1
+        """Analyze file types based on extensions and content.
+
+        Extensions are counted while walking the tree; only files without
+        one are opened here to check whether they are a binary or script.
+        """
+        for header in self._read_headers(self._no_suffix):
+            if header is None:
+                self.file_types['unknown'] += 1
+            elif header.startswith(b'#!'):
+                self.file_types['script'] += 1
+            elif header.startswith(b'\x7fELF'):
+                self.file_types['binary'] += 1
             else:
-                # Check if it's a binary, script, or other
-                try:
-                    with open(path, 'rb') as f:
-                        header = f.read(4)
-                        if header.startswith(b'#!'):
-                            self.file_types['script'] += 1
-                        elif header.startswith(b'\x7fELF'):
-                            self.file_types['binary'] += 1
-                        else:
-                            self.file_types['no_extension'] += 1
-                except:
-                    self.file_types['unknown'] += 1
+                self.file_types['no_extension'] += 1
     
     def _find_init_scripts(self):
-        """Find init and startup scripts."""
-        init_patterns = [
-            'init', 'rc', 'startup', 'boot', 'systemd',
-            'upstart', 'sysvinit', 'systemctl'
-        ]
+        """Find init and startup scripts.
+
+        Files are matched by name first; only small executables that are
+        not obviously binaries are opened to look for a shebang line.
+        """
+        init_search = _INIT_SCRIPT_RE.search
         
-        for file_path in self.file_stats:
-            path = Path(file_path)
-            filename = path.name.lower()
+        matches = []
+        candidates = []
+        records = zip(self.names, self.sizes.tolist(), self.modes.tolist())
+        for i, (name, size, mode) in enumerate(records):
+            filename = name.lower()
             
             # Check for init-related patterns
-            if any(pattern in filename for pattern in init_patterns):
-                self.init_scripts.append({
-                    'path': str(path),
-                    'size': self.file_stats[file_path]['size'],
-                    'permissions': oct(self.file_stats[file_path]['mode'])[-3:]
-                })
+            name_match = init_search(filename) is not None
             
             # Check for shebang scripts
-            try:
-                with open(path, 'r') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#!'):
-                        self.init_scripts.append({
-                            'path': str(path),
-                            'size': self.file_stats[file_path]['size'],
-                            'permissions': oct(self.file_stats[file_path]['mode'])[-3:],
-                            'interpreter': first_line[2:]
-                        })
-            except:
-                continue
+            sniff = (mode & 0o111 and size < _SHEBANG_MAX_SIZE
+                     and not filename.endswith(_BINARY_SUFFIXES) and '.so.' not in filename)
+            if sniff:
+                candidates.append(i)
+            if sniff or name_match:
+                matches.append((i, size, mode, name_match))
+        
+        headers = dict(zip(candidates, self._read_headers(candidates)))
+        
+        for i, size, mode, name_match in matches:
+            interpreter = _shebang_interpreter(headers.get(i))
+            if interpreter is not None:
+                self.init_scripts.append({
+                    'path': self._file_path(i),
+                    'size': size,
+                    'permissions': oct(mode)[-3:],
+                    'interpreter': interpreter
+                })
+            elif name_match:
+                self.init_scripts.append({
+                    'path': self._file_path(i),
+                    'size': size,
+                    'permissions': oct(mode)[-3:]
+                })
+    
+    def _read_headers(self, indices: List[int]) -> List[Optional[bytes]]:
+        """Read the headers of the given files, overlapping the reads in threads.
+
+        Headers already known to the cache for an unchanged file are reused
+        instead of being read again.
+        """
+        paths = [self._file_path(i) for i in indices]
+        idx = np.asarray(indices, dtype=np.intp)
+        keys = list(zip(
+            self.inodes[idx].tolist(),
+            self.sizes[idx].tolist(),
+            self.mtimes[idx].tolist()
+        ))
+        
+        headers = [self._headers.get(path, *key) for path, key in zip(paths, keys)]
+        missing = [pos for pos, header in enumerate(headers) if header is None]
+        
+        missing_paths = [paths[pos] for pos in missing]
+        if len(missing_paths) < 2 or self.threads == 1:
+            results = [_read_header(path) for path in missing_paths]
+        else:
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                results = list(executor.map(_read_header, missing_paths))
+        
+        for pos, header in zip(missing, results):
+            headers[pos] = header
+            if header is not None:
+                self._headers.put(paths[pos], *keys[pos], header)
+        
+        return headers
     
     def _calculate_directory_sizes(self):
         """Calculate total size for each directory."""
-        root_path_str = str(self.root_path)
+        root_path_str = self._root_str
+        root_len = len(root_path_str)
+        directory_sizes = self.directory_sizes
         
-        for file_path, stats in self.file_stats.items():
-            path = Path(file_path)
-            size = stats['size']
-            
-            # Add size to all parent directories within the analyzed filesystem
-            for parent in path.parents:
-                parent_str = str(parent)
-                # Only include directories that are within the analyzed filesystem
-                if parent_str.startswith(root_path_str):
-                    if parent_str in self.directory_sizes:
-                        self.directory_sizes[parent_str] += size
-                    else:
-                        self.directory_sizes[parent_str] = size
+        for directory, size in zip(self.dirs, self._dir_file_sizes.tolist()):
+            # Add size to the directory and all its parents up to the analyzed
+            # root; scanned paths never leave the root, so no prefix check is
+            # needed and the length test only guards against a runaway loop
+            parent = directory
+            while len(parent) >= root_len:
+                directory_sizes[parent] = directory_sizes.get(parent, 0) + size
+                if parent == root_path_str:
+                    break
+                parent = os.path.dirname(parent)
     
     def _find_large_files(self):
         """Find the largest files in the filesystem."""
-        sorted_files = sorted(
-            self.file_stats.items(),
-            key=lambda x: x[1]['size'],
-            reverse=True
-        )
+        idx = _top_k_indices(self.sizes, 20)
         
         self.large_files = [
             {
-                'path': file_path,
-                'size': stats['size'],
-                'size_human': self._human_readable_size(stats['size'])
+                'path': self._file_path(i),
+                'size': size,
+                'size_human': self._human_readable_size(size)
             }
-            for file_path, stats in sorted_files[:20]
+            for i, size in zip(idx.tolist(), self.sizes[idx].tolist())
         ]
     
     def _human_readable_size(self, size_bytes: int) -> str:
         """Convert bytes to human readable format."""
-        if size_bytes == 0:
-            return "0B"
-        
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        
-        return f"{size_bytes:.1f}{size_names[i]}"
+        return format_size(int(size_bytes))
     
     def _generate_report(self) -> Dict:
         """Generate comprehensive analysis report."""
-        total_files = len(self.file_stats)
-        total_size = sum(stats['size'] for stats in self.file_stats.values())
+        total_files = len(self.names)
+        total_size = int(self.sizes.sum())
         
         return {
             'total_files': total_files,
@@ -198,14 +742,27 @@ class FilesystemAnalyzer:
             'init_scripts': self.init_scripts,
             'large_files': self.large_files,
             'directory_sizes': self.directory_sizes,
+            'bloat': self._bloat_stats(),
             'mount_info': self._get_mount_info()
         }
     
+    def _bloat_stats(self) -> Dict:
+        """Summarize same-size and old files over the per-file arrays."""
+        duplicate_groups, duplicate_size = _duplicate_waste(self.sizes)
+        old_files, old_files_size = _old_file_stats(self.mtimes, self.sizes, time.time() - OLD_FILE_AGE)
+        
+        return {
+            'duplicate_groups': duplicate_groups,
+            'duplicate_size': duplicate_size,
+            'old_files': old_files,
+            'old_files_size': old_files_size
+        }
+    
     def _get_mount_info(self) -> Dict:
         """Get filesystem mount information."""
         try:
             # Find the mount point that contains the analyzed path
-            target_path = str(self.root_path)
+            target_path = self._root_str
             best_match = None
             best_match_length = 0
             
@@ -289,7 +846,7 @@ class FilesystemAnalyzer:
         table.add_column("Percentage", style="yellow")
         
         total_files = sum(file_types.values())
-        for file_type, count in sorted(file_types.items(), key=lambda x: x[1], reverse=True):
+        for file_type, count in sorted(file_types.items(), key=itemgetter(1), reverse=True):
             percentage = (count / total_files) * 100
             table.add_row(file_type, str(count), f"{percentage:.1f}%")
         
@@ -342,11 +899,11 @@ class FilesystemAnalyzer:
         if not directory_sizes:
             return
             
-        # Sort directories by size
-        sorted_dirs = sorted(
+        # Only the largest directories are shown, so select them with a bounded heap
+        sorted_dirs = heapq.nlargest(
+            15,
             directory_sizes.items(),
-            key=lambda x: x[1],
-            reverse=True
+            key=itemgetter(1)
         )
         
         table = Table(title="[bold blue]Largest Directories[/bold blue]")
@@ -355,7 +912,7 @@ class FilesystemAnalyzer:
         table.add_column("Percentage", style="yellow")
         
         total_size = sum(directory_sizes.values())
-        for directory, size in sorted_dirs[:15]:
+        for directory, size in sorted_dirs:
             percentage = (size / total_size) * 100
             table.add_row(
                 directory,
@@ -378,26 +935,15 @@ class FilesystemAnalyzer:
         if large_binaries:
             bloat_sources.append(f"Large binaries: {len(large_binaries)} files > 10MB")
         
-        # Check for duplicate files (same size)
-        size_groups = defaultdict(list)
-        for file_path, stats in self.file_stats.items():
-            size_groups[stats['size']].append(file_path)
+        bloat = report['bloat']
         
-        duplicates = {size: files for size, files in size_groups.items() if len(files) > 1}
-        if duplicates:
-            total_duplicate_size = sum(size * (len(files) - 1) for size, files in duplicates.items())
-            bloat_sources.append(f"Potential duplicates: {self._human_readable_size(total_duplicate_size)}")
+        # Check for duplicate files (same size)
+        if bloat['duplicate_groups']:
+            bloat_sources.append(f"Potential duplicates: {self._human_readable_size(bloat['duplicate_size'])}")
         
         # Check for old files
-        current_time = time.time()
-        old_files = []
-        for file_path, stats in self.file_stats.items():
-            if current_time - stats['mtime'] > 365 * 24 * 3600:  # > 1 year
-                old_files.append(file_path)
-        
-        if old_files:
-            old_files_size = sum(self.file_stats[f]['size'] for f in old_files)
-            bloat_sources.append(f"Old files (>1 year): {self._human_readable_size(old_files_size)}")
+        if bloat['old_files']:
+            bloat_sources.append(f"Old files (>1 year): {self._human_readable_size(bloat['old_files_size'])}")
         
         if bloat_sources:
             for source in bloat_sources:
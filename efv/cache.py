@@ -0,0 +1,96 @@
+"""
+Persistent file header cache for EFV.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from typing import Dict, List, Optional
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory for EFV."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'efv')
+
+
+class HeaderCache:
+    """File headers keyed by path and validated by inode, size and mtime.
+
+    Without a cache directory nothing is loaded from or written to disk.
+    """
+
+    VERSION = 2
+
+    def __init__(self, root: str, cache_dir: Optional[str] = None):
+        self.root = root
+        self.path = None
+        if cache_dir:
+            name = hashlib.sha1(root.encode('utf-8', 'surrogateescape')).hexdigest()
+            self.path = os.path.join(cache_dir, f"{name}.json.gz")
+
+        self._entries: Dict[str, List] = {}
+        self._used: Dict[str, List] = {}
+        self._load()
+
+    def get(self, path: str, inode: int, size: int, mtime: float) -> Optional[bytes]:
+        """Return the cached header of a file, or None if missing or stale."""
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        try:
+            if entry[0] != inode or entry[1] != size or entry[2] != mtime:
+                return None
+            header = entry[3].encode('latin-1')
+        except (TypeError, IndexError, AttributeError, ValueError):
+            # Malformed entries are misses; the header is read and stored again
+            return None
+        self._used[path] = entry
+        return header
+
+    def put(self, path: str, inode: int, size: int, mtime: float, header: bytes):
+        """Store the header read from a file."""
+        entry = [inode, size, mtime, header.decode('latin-1')]
+        self._entries[path] = entry
+        self._used[path] = entry
+
+    def save(self):
+        """Write the entries used in this run back to disk."""
+        if not self.path:
+            return
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so concurrent runs never see a partial cache
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump({
+                    'version': self.VERSION,
+                    'root': self.root,
+                    'headers': self._used
+                }, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _load(self):
+        """Load a previously saved cache, ignoring missing or unusable files."""
+        if not self.path:
+            return
+
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, EOFError, ValueError):
+            return
+
+        if not isinstance(data, dict):
+            return
+        headers = data.get('headers')
+        if data.get('version') == self.VERSION and data.get('root') == self.root and isinstance(headers, dict):
+            self._entries = headers
@@ -4,10 +4,31 @@ Command-line interface for EFV.
 
 import os
 import sys
-import time
+import gzip
 import argparse
 from pathlib import Path
-from .analyzer import FilesystemAnalyzer
+from typing import IO
+from .analyzer import FilesystemAnalyzer, DEFAULT_SCAN_THREADS
+from .cache import default_cache_dir
+from .report import write_text_report, write_json_report, write_csv_report
+
+REPORT_FORMATS = ("text", "json", "csv")
+
+
+def _infer_format(output: str) -> str:
+    """Guess the report format from the output file name."""
+    name = output[:-3] if output.endswith(".gz") else output
+    for fmt in ("json", "csv"):
+        if name.endswith(f".{fmt}"):
+            return fmt
+    return "text"
+
+
+def _open_output(output: str) -> IO[bytes]:
+    """Open the report file for writing, gzip-compressed for .gz names."""
+    if output.endswith(".gz"):
+        return gzip.open(output, "wb")
+    return open(output, "wb")
 
 
 def main():
@@ -26,6 +47,30 @@ def main():
         "-o",
         help="Output report to file"
     )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=REPORT_FORMATS,
+        help="Report file format (default: from the output file name, else text); "
+             "csv writes one row per file, a .gz suffix compresses the file"
+    )
+    parser.add_argument(
+        "--threads",
+        "-j",
+        type=int,
+        default=DEFAULT_SCAN_THREADS,
+        help=f"Number of directory scanner threads (default: {DEFAULT_SCAN_THREADS})"
+    )
+    parser.add_argument(
+        "--pwalk",
+        action="store_true",
+        help="Walk the tree with the pwalk C library if it is installed"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or update the file header cache"
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -41,7 +86,12 @@ def main():
         sys.exit(1)
     
     # Create analyzer and run analysis
-    analyzer = FilesystemAnalyzer(args.path)
+    analyzer = FilesystemAnalyzer(
+        args.path,
+        threads=args.threads,
+        use_pwalk=args.pwalk,
+        cache_dir=None if args.no_cache else default_cache_dir()
+    )
     
     try:
         report = analyzer.analyze_filesystem()
@@ -49,13 +99,14 @@ def main():
         
         # Save report to file if requested
         if args.output:
-            with open(args.output, 'w') as f:
-                f.write("Embedded Filesystem Visualizer Report\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(f"Analyzed path: {args.path}\n")
-                f.write(f"Total files: {report['total_files']:,}\n")
-                f.write(f"Total size: {report['total_size_human']}\n")
-                f.write(f"Analysis completed at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            fmt = args.format or _infer_format(args.output)
+            with _open_output(args.output) as f:
+                if fmt == "json":
+                    write_json_report(f, args.path, report)
+                elif fmt == "csv":
+                    write_csv_report(f, analyzer)
+                else:
+                    write_text_report(f, args.path, report)
             
             print(f"\nReport saved to: {args.output}")
     
@@ -4,13 +4,79 @@ Graphical user interface for EFV.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import heapq
 import threading
+import multiprocessing
 import os
 import sys
 from pathlib import Path
-import json
-from datetime import datetime
-from .analyzer import FilesystemAnalyzer
+from itertools import islice
+from operator import itemgetter
+from queue import Empty
+from .analyzer import FilesystemAnalyzer, format_size
+from .report import write_json_report, write_text_report
+
+# Status messages from the analysis process are coalesced into one label
+# update per interval, however fast the scanner produces them
+PROGRESS_INTERVAL_MS = 50
+
+# Rows inserted into a treeview per idle callback, so the first screen of a
+# long list is shown promptly while the rest streams in
+TREE_BATCH_SIZE = 500
+
+# Progress queue of the analysis process, set by _init_analysis_worker
+_progress_queue = None
+
+
+def _init_analysis_worker(progress_queue):
+    """Keep the queue that carries status messages back to the GUI."""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+class _ProgressForwarder:
+    """Send the latest status message to the GUI at most once per interval.
+
+    The scanner reports every directory it enters; queueing each of those
+    messages would cost the GUI more time unpickling them than showing them.
+    """
+    
+    def __init__(self, put):
+        self._put = put
+        self._latest = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._forward, daemon=True)
+        self._thread.start()
+    
+    def update(self, message):
+        """Record a status message; called from any scanner thread."""
+        self._latest = message
+    
+    def _forward(self):
+        sent = None
+        while True:
+            stopped = self._stopped.wait(PROGRESS_INTERVAL_MS / 1000)
+            message = self._latest
+            if message is not sent:
+                self._put(message)
+                sent = message
+            if stopped:
+                return
+    
+    def close(self):
+        """Send any message still held back and stop forwarding."""
+        self._stopped.set()
+        self._thread.join()
+
+
+def _run_analysis(path):
+    """Analyze a filesystem in the worker process and return the report."""
+    progress = _ProgressForwarder(_progress_queue.put)
+    try:
+        analyzer = FilesystemAnalyzer(path, progress_callback=progress.update)
+        return analyzer.analyze_filesystem()
+    finally:
+        progress.close()
 
 
 class EFVGUI:
@@ -28,8 +94,17 @@ class EFVGUI:
         self.style.configure('Treeview', background='#3c3c3c', foreground='white', fieldbackground='#3c3c3c')
         self.style.configure('Treeview.Heading', background='#4a4a4a', foreground='white')
         
-        self.analyzer = None
         self.report = None
+        # Bumped for each new report; tabs remember the one they last rendered
+        self._report_generation = 0
+        self._rendered = {}
+        # The analysis runs in a separate process so its work never holds
+        # the GIL of the Tk event loop; both are created on first use
+        self._pool = None
+        self._progress_queue = None
+        self._progress_job = None
+        # Pending idle callbacks that insert the remaining rows of each tree
+        self._tree_jobs = {}
         self.setup_ui()
     
     def setup_ui(self):
@@ -62,7 +137,8 @@ class EFVGUI:
         self.path_entry.pack(side=tk.LEFT, padx=(10, 5))
         
         ttk.Button(path_frame, text="Browse", command=self.browse_path).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Button(path_frame, text="Analyze", command=self.start_analysis).pack(side=tk.LEFT)
+        self.analyze_button = ttk.Button(path_frame, text="Analyze", command=self.start_analysis)
+        self.analyze_button.pack(side=tk.LEFT)
         
         # Progress bar
         self.progress_var = tk.StringVar(value="Ready")
@@ -210,7 +286,11 @@ class EFVGUI:
             self.path_var.set(path)
     
     def start_analysis(self):
-        """Start the filesystem analysis in a separate thread."""
+        """Start the filesystem analysis in a separate process."""
+        # Only one analysis runs at a time
+        if self._progress_job is not None:
+            return
+        
         path = self.path_var.get()
         if not os.path.exists(path):
             messagebox.showerror("Error", f"Path '{path}' does not exist.")
@@ -219,30 +299,61 @@ class EFVGUI:
         # Clear previous results
         self.clear_results()
         
-        # Start analysis thread
+        if self._pool is None:
+            self._progress_queue = multiprocessing.Queue()
+            self._pool = multiprocessing.Pool(
+                processes=1,
+                initializer=_init_analysis_worker,
+                initargs=(self._progress_queue,)
+            )
+        
+        # Start analysis process
         self.progress_var.set("Analyzing filesystem...")
         self.progress_bar.start()
-        
-        thread = threading.Thread(target=self.run_analysis, args=(path,))
-        thread.daemon = True
-        thread.start()
+        self.analyze_button.state(['disabled'])
+        self._drain_progress()
+        self._progress_job = self.root.after(PROGRESS_INTERVAL_MS, self._flush_progress)
+        
+        # The callbacks run on the pool's result thread, so they only hand
+        # the outcome over to the main thread
+        self._pool.apply_async(
+            _run_analysis,
+            (path,),
+            callback=lambda report: self.root.after(0, self.analysis_complete, report),
+            error_callback=lambda e: self.root.after(0, self.analysis_error, str(e))
+        )
     
-    def run_analysis(self, path):
-        """Run the analysis in a separate thread."""
+    def _drain_progress(self):
+        """Empty the progress queue and return the latest message, if any."""
+        message = None
         try:
-            self.analyzer = FilesystemAnalyzer(path)
-            self.report = self.analyzer.analyze_filesystem()
-            
-            # Update UI in main thread
-            self.root.after(0, self.analysis_complete)
-            
-        except Exception as e:
-            self.root.after(0, lambda: self.analysis_error(str(e)))
+            while True:
+                message = self._progress_queue.get_nowait()
+        except Empty:
+            pass
+        return message
     
-    def analysis_complete(self):
-        """Called when analysis is complete."""
+    def _flush_progress(self):
+        """Show the latest status message, at most once per interval."""
+        message = self._drain_progress()
+        if message is not None:
+            self.progress_var.set(message)
+        self._progress_job = self.root.after(PROGRESS_INTERVAL_MS, self._flush_progress)
+    
+    def _stop_progress(self):
+        """Stop the status updates and the progress bar, and allow a new analysis."""
+        if self._progress_job is not None:
+            self.root.after_cancel(self._progress_job)
+            self._progress_job = None
         self.progress_bar.stop()
+        self.analyze_button.state(['!disabled'])
+    
+    def analysis_complete(self, report):
+        """Called when analysis is complete."""
+        self.report = report
+        self._stop_progress()
         self.progress_var.set("Analysis complete!")
+        self._report_generation += 1
         
         # Update all tabs
         self.update_overview()
@@ -256,126 +367,156 @@ class EFVGUI:
     
     def analysis_error(self, error_msg):
         """Called when analysis encounters an error."""
-        self.progress_bar.stop()
+        self._stop_progress()
         self.progress_var.set("Analysis failed!")
         messagebox.showerror("Error", f"Analysis failed: {error_msg}")
     
+    def shutdown(self):
+        """Stop the analysis process, abandoning any analysis in progress."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+    
     def clear_results(self):
         """Clear all result displays."""
         self.overview_text.delete(1.0, tk.END)
         self.bloat_text.delete(1.0, tk.END)
         
         for tree in [self.file_tree, self.init_tree, self.large_tree, self.dir_tree]:
-            for item in tree.get_children():
-                tree.delete(item)
+            self._cancel_tree_batches(tree)
+            tree.delete(*tree.get_children())
+        
+        self._rendered.clear()
+    
+    def _needs_update(self, tab):
+        """Return whether a tab still has to render the current report."""
+        if not self.report or self._rendered.get(tab) == self._report_generation:
+            return False
+        self._rendered[tab] = self._report_generation
+        return True
+    
+    def _populate_tree(self, tree, rows):
+        """Replace the rows of a treeview, inserting long lists in batches."""
+        self._cancel_tree_batches(tree)
+        tree.delete(*tree.get_children())
+        
+        # Unmapped widgets skip geometry and redraw work, so the tree is
+        # laid out once after the first batch instead of once per row
+        tree.pack_forget()
+        try:
+            self._insert_tree_batch(tree, iter(rows))
+        finally:
+            # Never leave the tab empty if building a row fails
+            tree.pack(fill=tk.BOTH, expand=True)
+    
+    def _insert_tree_batch(self, tree, rows):
+        """Insert the next batch of rows and schedule the rest for idle time."""
+        insert = tree.insert
+        count = 0
+        for values in islice(rows, TREE_BATCH_SIZE):
+            insert("", tk.END, values=values)
+            count += 1
+        
+        if count == TREE_BATCH_SIZE:
+            self._tree_jobs[tree] = self.root.after_idle(self._insert_tree_batch, tree, rows)
+        else:
+            self._tree_jobs.pop(tree, None)
+    
+    def _cancel_tree_batches(self, tree):
+        """Drop the rows still waiting to be inserted into a treeview."""
+        job = self._tree_jobs.pop(tree, None)
+        if job is not None:
+            self.root.after_cancel(job)
     
     def update_overview(self):
         """Update the overview tab."""
-        if not self.report:
+        if not self._needs_update('overview'):
             return
         
-        overview = f"""Filesystem Overview
+        parts = [f"""Filesystem Overview
 {'='*50}
 
 Total Files: {self.report['total_files']:,}
 Total Size: {self.report['total_size_human']}
-Average File Size: {self.analyzer._human_readable_size(self.report['total_size'] // max(self.report['total_files'], 1))}
+Average File Size: {format_size(self.report['total_size'] // max(self.report['total_files'], 1))}
 
 Mount Information:
-"""
+"""]
         
         if self.report['mount_info']:
-            for key, value in self.report['mount_info'].items():
-                overview += f"  {key.title()}: {value}\n"
+            parts.extend(f"  {key.title()}: {value}\n" for key, value in self.report['mount_info'].items())
         else:
-            overview += "  No mount information available\n"
+            parts.append("  No mount information available\n")
         
         self.overview_text.delete(1.0, tk.END)
-        self.overview_text.insert(1.0, overview)
+        self.overview_text.insert(1.0, "".join(parts))
     
     def update_file_analysis(self):
         """Update the file analysis tab."""
-        if not self.report or not self.report['file_types']:
+        if not self._needs_update('file_analysis') or not self.report['file_types']:
             return
         
-        # Clear existing items
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
-        
         # Add file types
         total_files = sum(self.report['file_types'].values())
-        for file_type, count in sorted(self.report['file_types'].items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / total_files) * 100
-            self.file_tree.insert("", tk.END, values=(file_type, count, f"{percentage:.1f}%"))
+        rows = [
+            (file_type, count, f"{(count / total_files) * 100:.1f}%")
+            for file_type, count in sorted(self.report['file_types'].items(), key=itemgetter(1), reverse=True)
+        ]
+        
+        self._populate_tree(self.file_tree, rows)
     
     def update_init_scripts(self):
         """Update the init scripts tab."""
-        if not self.report or not self.report['init_scripts']:
+        if not self._needs_update('init_scripts') or not self.report['init_scripts']:
             return
         
-        # Clear existing items
-        for item in self.init_tree.get_children():
-            self.init_tree.delete(item)
-        
         # Add init scripts
-        for script in self.report['init_scripts']:
-            interpreter = script.get('interpreter', 'N/A')
-            self.init_tree.insert("", tk.END, values=(
-                script['path'],
-                self.analyzer._human_readable_size(script['size']),
-                script['permissions'],
-                interpreter
-            ))
+        rows = [
+            (script['path'], format_size(script['size']), script['permissions'], script.get('interpreter', 'N/A'))
+            for script in self.report['init_scripts']
+        ]
+        
+        self._populate_tree(self.init_tree, rows)
     
     def update_large_files(self):
         """Update the large files tab."""
-        if not self.report or not self.report['large_files']:
+        if not self._needs_update('large_files') or not self.report['large_files']:
             return
         
-        # Clear existing items
-        for item in self.large_tree.get_children():
-            self.large_tree.delete(item)
-        
         # Add large files
-        for i, file_info in enumerate(self.report['large_files'], 1):
-            self.large_tree.insert("", tk.END, values=(
-                i,
-                file_info['path'],
-                file_info['size_human']
-            ))
+        rows = [
+            (i, file_info['path'], file_info['size_human'])
+            for i, file_info in enumerate(self.report['large_files'], 1)
+        ]
+        
+        self._populate_tree(self.large_tree, rows)
     
     def update_directory_analysis(self):
         """Update the directory analysis tab."""
-        if not self.report or not self.report['directory_sizes']:
+        if not self._needs_update('directory_analysis') or not self.report['directory_sizes']:
             return
         
-        # Clear existing items
-        for item in self.dir_tree.get_children():
-            self.dir_tree.delete(item)
-        
-        # Add directory sizes
-        sorted_dirs = sorted(
+        # Add directory sizes; only the top 20 are shown, so select them
+        # with a bounded heap instead of sorting every directory
+        sorted_dirs = heapq.nlargest(
+            20,
             self.report['directory_sizes'].items(),
-            key=lambda x: x[1],
-            reverse=True
+            key=itemgetter(1)
         )
         
         total_size = sum(self.report['directory_sizes'].values())
-        for directory, size in sorted_dirs[:20]:  # Top 20
-            percentage = (size / total_size) * 100
-            self.dir_tree.insert("", tk.END, values=(
-                directory,
-                self.analyzer._human_readable_size(size),
-                f"{percentage:.1f}%"
-            ))
+        rows = [
+            (directory, format_size(size), f"{(size / total_size) * 100:.1f}%")
+            for directory, size in sorted_dirs
+        ]
+        
+        self._populate_tree(self.dir_tree, rows)
     
     def update_bloat_analysis(self):
         """Update the bloat analysis tab."""
-        if not self.report:
+        if not self._needs_update('bloat_analysis'):
             return
         
-        bloat_text = "BLOAT ANALYSIS\n" + "="*40 + "\n\n"
-        
         # Analyze potential bloat sources
         bloat_sources = []
         
@@ -384,39 +525,24 @@ Mount Information:
         if large_binaries:
             bloat_sources.append(f"Large binaries: {len(large_binaries)} files > 10MB")
         
+        bloat = self.report['bloat']
+        
         # Check for duplicate files (same size)
-        size_groups = {}
-        for file_path, stats in self.analyzer.file_stats.items():
-            size = stats['size']
-            if size not in size_groups:
-                size_groups[size] = []
-            size_groups[size].append(file_path)
-        
-        duplicates = {size: files for size, files in size_groups.items() if len(files) > 1}
-        if duplicates:
-            total_duplicate_size = sum(size * (len(files) - 1) for size, files in duplicates.items())
-            bloat_sources.append(f"Potential duplicates: {self.analyzer._human_readable_size(total_duplicate_size)}")
+        if bloat['duplicate_groups']:
+            bloat_sources.append(f"Potential duplicates: {format_size(bloat['duplicate_size'])}")
         
         # Check for old files
-        import time
-        current_time = time.time()
-        old_files = []
-        for file_path, stats in self.analyzer.file_stats.items():
-            if current_time - stats['mtime'] > 365 * 24 * 3600:  # > 1 year
-                old_files.append(file_path)
-        
-        if old_files:
-            old_files_size = sum(self.analyzer.file_stats[f]['size'] for f in old_files)
-            bloat_sources.append(f"Old files (>1 year): {self.analyzer._human_readable_size(old_files_size)}")
+        if bloat['old_files']:
+            bloat_sources.append(f"Old files (>1 year): {format_size(bloat['old_files_size'])}")
         
+        parts = ["BLOAT ANALYSIS\n", "="*40, "\n\n"]
         if bloat_sources:
-            for source in bloat_sources:
-                bloat_text += f"• {source}\n"
+            parts.extend(f"• {source}\n" for source in bloat_sources)
         else:
-            bloat_text += "No obvious bloat sources detected.\n"
+            parts.append("No obvious bloat sources detected.\n")
         
         self.bloat_text.delete(1.0, tk.END)
-        self.bloat_text.insert(1.0, bloat_text)
+        self.bloat_text.insert(1.0, "".join(parts))
     
     def export_report(self):
         """Export the report to a text file."""
@@ -431,13 +557,8 @@ Mount Information:
         
         if filename:
             try:
-                with open(filename, 'w') as f:
-                    f.write("Embedded Filesystem Visualizer Report\n")
-                    f.write("=" * 50 + "\n\n")
-                    f.write(f"Analyzed path: {self.path_var.get()}\n")
-                    f.write(f"Total files: {self.report['total_files']:,}\n")
-                    f.write(f"Total size: {self.report['total_size_human']}\n")
-                    f.write(f"Analysis completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                with open(filename, 'wb') as f:
+                    write_text_report(f, self.path_var.get(), self.report)
                 
                 messagebox.showinfo("Success", f"Report exported to {filename}")
             except Exception as e:
@@ -455,36 +576,33 @@ Mount Information:
         )
         
         if filename:
-            try:
-                # Convert report to JSON-serializable format
-                json_report = {
-                    'metadata': {
-                        'analyzed_path': self.path_var.get(),
-                        'total_files': self.report['total_files'],
-                        'total_size': self.report['total_size'],
-                        'total_size_human': self.report['total_size_human'],
-                        'analysis_time': datetime.now().isoformat()
-                    },
-                    'file_types': self.report['file_types'],
-                    'init_scripts': self.report['init_scripts'],
-                    'large_files': self.report['large_files'],
-                    'directory_sizes': self.report['directory_sizes'],
-                    'mount_info': self.report['mount_info']
-                }
-                
-                with open(filename, 'w') as f:
-                    json.dump(json_report, f, indent=2)
-                
-                messagebox.showinfo("Success", f"JSON report saved to {filename}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save JSON: {e}")
+            # Serialize on a worker thread so large reports don't freeze the UI
+            thread = threading.Thread(
+                target=self._write_json_worker,
+                args=(filename, self.path_var.get(), self.report)
+            )
+            thread.daemon = True
+            thread.start()
+    
+    def _write_json_worker(self, filename, path, report):
+        """Write the JSON report in a separate thread."""
+        try:
+            with open(filename, 'wb') as f:
+                write_json_report(f, path, report)
+            
+            self.root.after(0, messagebox.showinfo, "Success", f"JSON report saved to {filename}")
+        except Exception as e:
+            self.root.after(0, messagebox.showerror, "Error", f"Failed to save JSON: {e}")
 
 
 def main():
     """Main entry point for GUI application."""
     root = tk.Tk()
     app = EFVGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.shutdown()
 
 
 if __name__ == "__main__":
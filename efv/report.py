@@ -0,0 +1,74 @@
+"""
+Report file writers shared by the CLI and the GUI.
+"""
+
+import io
+import csv
+import json
+from datetime import datetime
+from typing import IO, Dict
+from .analyzer import FilesystemAnalyzer
+
+try:
+    # Optional, considerably faster JSON encoder
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared by every JSON report; without orjson the document is streamed
+# through iterencode() rather than built as one string
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+def write_text_report(f: IO[bytes], path: str, report: Dict):
+    """Write the plain text summary."""
+    f.write((
+        "Embedded Filesystem Visualizer Report\n"
+        + "=" * 50 + "\n\n"
+        f"Analyzed path: {path}\n"
+        f"Total files: {report['total_files']:,}\n"
+        f"Total size: {report['total_size_human']}\n"
+        f"Analysis completed at: {datetime.now().isoformat(sep=' ', timespec='seconds')}\n"
+    ).encode("utf-8"))
+
+
+def write_json_report(f: IO[bytes], path: str, report: Dict):
+    """Write the complete report as JSON."""
+    json_report = {
+        'metadata': {
+            'analyzed_path': path,
+            'total_files': report['total_files'],
+            'total_size': report['total_size'],
+            'total_size_human': report['total_size_human'],
+            'analysis_time': datetime.now().isoformat()
+        },
+        'file_types': report['file_types'],
+        'init_scripts': report['init_scripts'],
+        'large_files': report['large_files'],
+        'directory_sizes': report['directory_sizes'],
+        'mount_info': report['mount_info']
+    }
+    
+    if orjson is not None:
+        try:
+            f.write(orjson.dumps(json_report))
+            return
+        except orjson.JSONEncodeError:
+            # Names that are not valid UTF-8 hold surrogate escapes, which
+            # orjson rejects; the standard encoder writes them as \u escapes
+            pass
+    
+    text = io.TextIOWrapper(f, encoding="utf-8")
+    text.writelines(_JSON_ENCODER.iterencode(json_report))
+    text.flush()
+    text.detach()
+
+
+def write_csv_report(f: IO[bytes], analyzer: FilesystemAnalyzer):
+    """Write one row of metadata per file, ready for DuckDB or pandas."""
+    text = io.TextIOWrapper(f, encoding="utf-8", errors="surrogateescape", newline="")
+    writer = csv.writer(text)
+    writer.writerow(["path", "size", "mode", "mtime", "uid", "gid"])
+    writer.writerows(analyzer.iter_file_stats())
+    text.flush()
+    text.detach()
@@ -0,0 +1,16 @@
+"""
+Shared fixtures for the EFV tests.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def rootfs(tmp_path):
+    """A minimal root filesystem holding three files."""
+    (tmp_path / "etc").mkdir()
+    (tmp_path / "etc" / "passwd").write_text("root:x:0:0:root:/root:/bin/bash")
+    (tmp_path / "etc" / "hosts").write_text("127.0.0.1 localhost")
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "bash").write_bytes(b'\x7fELF' + b'\x00' * 1000)
+    return str(tmp_path)
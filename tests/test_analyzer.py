@@ -5,8 +5,14 @@ Unit tests for the EFV analyzer module.
 import pytest
 import tempfile
 import os
+import gzip
+import json
 from pathlib import Path
-from efv.analyzer import FilesystemAnalyzer
+import numpy as np
+from efv.analyzer import (
+    FilesystemAnalyzer, _ScanQueue, _top_k_indices, _duplicate_waste, _old_file_stats
+)
+from efv.cache import HeaderCache
 
 
 class TestFilesystemAnalyzer:
@@ -41,6 +47,8 @@ class TestFilesystemAnalyzer:
         (test_path / "bin" / "bash").write_bytes(b'\x7fELF' + b'\x00' * 1000)
         (test_path / "etc" / "init.d" / "network").write_text("#!/bin/bash\necho 'Starting network'")
         (test_path / "etc" / "rc.local").write_text("#!/bin/bash\necho 'Local startup'")
+        (test_path / "etc" / "init.d" / "network").chmod(0o755)
+        (test_path / "etc" / "rc.local").chmod(0o755)
         (test_path / "usr" / "lib" / "libc.so.6").write_bytes(b'\x7fELF' + b'\x00' * 2000000)
         (test_path / "etc" / "passwd").write_text("root:x:0:0:root:/root:/bin/bash")
         (test_path / "etc" / "hosts").write_text("127.0.0.1 localhost")
@@ -48,7 +56,8 @@ class TestFilesystemAnalyzer:
     def test_init(self):
         """Test analyzer initialization."""
         assert self.analyzer.root_path == Path(self.temp_dir).resolve()
-        assert isinstance(self.analyzer.file_stats, dict)
+        assert isinstance(self.analyzer.paths, list)
+        assert isinstance(self.analyzer.sizes, np.ndarray)
         assert isinstance(self.analyzer.directory_sizes, dict)
         assert isinstance(self.analyzer.init_scripts, list)
         assert isinstance(self.analyzer.large_files, list)
@@ -59,19 +68,154 @@ class TestFilesystemAnalyzer:
         self.analyzer._collect_file_stats()
         
         # Should have collected stats for our test files
-        assert len(self.analyzer.file_stats) > 0
+        assert len(self.analyzer.paths) > 0
         
         # Check that we have stats for known files
         bash_path = str(Path(self.temp_dir) / "bin" / "bash")
-        assert bash_path in self.analyzer.file_stats
+        assert bash_path in self.analyzer.paths
         
-        # Check that stats contain expected keys
-        stats = self.analyzer.file_stats[bash_path]
-        assert 'size' in stats
-        assert 'mode' in stats
-        assert 'mtime' in stats
-        assert 'uid' in stats
-        assert 'gid' in stats
+        # Check that the per-file arrays line up with the paths
+        n = len(self.analyzer.paths)
+        for field in ('names', 'dir_ids', 'sizes', 'modes', 'mtimes', 'uids', 'gids'):
+            assert len(getattr(self.analyzer, field)) == n
+        
+        i = self.analyzer.paths.index(bash_path)
+        assert self.analyzer.sizes[i] == 1004
+    
+    def test_collect_skips_non_regular_files(self):
+        """Symlinks and special files should not be counted as files."""
+        test_path = Path(self.temp_dir)
+        (test_path / "bin" / "sh").symlink_to("bash")
+        (test_path / "usr" / "lib64").symlink_to("lib")
+        if hasattr(os, "mkfifo"):
+            os.mkfifo(str(test_path / "etc" / "initctl"))
+        
+        self.analyzer._collect_file_stats()
+        
+        assert len(self.analyzer.paths) == 6
+        assert str(test_path / "bin" / "sh") not in self.analyzer.paths
+    
+    def test_collect_file_stats_threads(self):
+        """Threaded and single-threaded scans should find the same files."""
+        self.analyzer._collect_file_stats()
+        
+        single = FilesystemAnalyzer(self.temp_dir, threads=1)
+        single._collect_file_stats()
+        
+        assert sorted(single.paths) == sorted(self.analyzer.paths)
+        assert single.sizes.sum() == self.analyzer.sizes.sum()
+    
+    def test_scan_queue_cancel(self):
+        """A cancelled walk should release waiting and later scanners."""
+        queue = _ScanQueue(self.temp_dir)
+        assert queue.get() == self.temp_dir
+        queue.task_done(["a", "b"])
+        
+        queue.cancel()
+        assert queue.get() is None
+        assert queue.get() is None
+    
+    def test_iter_file_stats(self):
+        """File records should mirror the per-file arrays."""
+        self.analyzer._collect_file_stats()
+        
+        stats = {stat.path: stat for stat in self.analyzer.iter_file_stats()}
+        assert len(stats) == len(self.analyzer.names)
+        
+        passwd = stats[os.path.join(self.analyzer._root_str, 'etc', 'passwd')]
+        assert passwd.size == len("root:x:0:0:root:/root:/bin/bash")
+        assert passwd.uid == os.getuid()
+        assert isinstance(passwd.size, int)
+    
+    def test_iter_file_stats_chunked(self, monkeypatch):
+        """Records should not depend on where the chunk boundaries fall."""
+        self.analyzer._collect_file_stats()
+        expected = list(self.analyzer.iter_file_stats())
+        
+        monkeypatch.setattr("efv.analyzer._RECORD_CHUNK", 3)
+        assert list(self.analyzer.iter_file_stats()) == expected
+        assert [stat.path for stat in expected] == self.analyzer.paths
+    
+    def test_collect_with_pwalk(self, monkeypatch):
+        """The pwalk path should record the same files as the built-in scanner."""
+        test_path = Path(self.temp_dir)
+        (test_path / "bin" / "sh").symlink_to("bash")
+        monkeypatch.setattr("efv.analyzer._fastwalk", os.walk)
+        
+        self.analyzer._collect_file_stats()
+        walked = FilesystemAnalyzer(self.temp_dir, use_pwalk=True)
+        walked._collect_file_stats()
+        
+        def by_path(analyzer):
+            return sorted(zip(analyzer.paths, analyzer.sizes.tolist()))
+        
+        def dir_sizes(analyzer):
+            return dict(zip(analyzer.dirs, analyzer._dir_file_sizes.tolist()))
+        
+        assert by_path(walked) == by_path(self.analyzer)
+        assert sorted(walked.names) == sorted(self.analyzer.names)
+        assert dir_sizes(walked) == dir_sizes(self.analyzer)
+        assert str(test_path / "bin" / "sh") not in walked.paths
+    
+    def test_header_cache(self, monkeypatch):
+        """Test that a second run reuses cached file headers."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analyzer = FilesystemAnalyzer(self.temp_dir, cache_dir=cache_dir)
+            first = analyzer.analyze_filesystem()
+            assert os.listdir(cache_dir)
+            
+            # Every header should now come from the cache
+            def fail(path):
+                raise AssertionError(f"unexpected read of {path}")
+            monkeypatch.setattr("efv.analyzer._read_header", fail)
+            
+            analyzer = FilesystemAnalyzer(self.temp_dir, cache_dir=cache_dir)
+            second = analyzer.analyze_filesystem()
+            assert second['file_types'] == first['file_types']
+            assert len(second['init_scripts']) == len(first['init_scripts'])
+    
+    def test_header_cache_malformed(self):
+        """Cache files of the wrong shape should be ignored, not crash the analysis."""
+        expected = self.analyzer.analyze_filesystem()['file_types']
+        root = self.analyzer._root_str
+        passwd = os.path.join(root, 'etc', 'passwd')
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = HeaderCache(root, cache_dir).path
+            for data in (
+                [1, 2, 3],
+                {'version': HeaderCache.VERSION, 'root': root, 'headers': [passwd]},
+                {'version': HeaderCache.VERSION, 'root': root, 'headers': {passwd: [1]}},
+                {'version': HeaderCache.VERSION, 'root': root, 'headers': {passwd: 7}},
+            ):
+                with gzip.open(cache_path, 'wt', encoding='utf-8') as f:
+                    json.dump(data, f)
+                
+                analyzer = FilesystemAnalyzer(self.temp_dir, cache_dir=cache_dir)
+                assert analyzer.analyze_filesystem()['file_types'] == expected
+    
+    def test_header_cache_subsecond_rewrite(self):
+        """A same-size rewrite within the same second should not reuse the header."""
+        tool = Path(self.temp_dir) / "bin" / "tool"
+        tool.write_bytes(b"#!/bin/sh\n")
+        base = 1_700_000_000 * 10**9
+        os.utime(tool, ns=(base, base + 100_000_000))
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analyzer = FilesystemAnalyzer(self.temp_dir, cache_dir=cache_dir)
+            analyzer.analyze_filesystem()
+            scripts = analyzer.file_types['script']
+            binaries = analyzer.file_types['binary']
+            assert analyzer.mtimes.tolist().count(os.stat(tool).st_mtime) == 1
+            
+            with open(tool, "r+b") as f:
+                f.write(b"\x7fELF\x00\x00\x00\x00\x00\x00")
+            os.utime(tool, ns=(base, base + 600_000_000))
+            
+            analyzer = FilesystemAnalyzer(self.temp_dir, cache_dir=cache_dir)
+            analyzer.analyze_filesystem()
+            assert analyzer.file_types['script'] == scripts - 1
+            assert analyzer.file_types['binary'] == binaries + 1
     
     def test_analyze_file_types(self):
         """Test file type analysis."""
@@ -96,6 +240,11 @@ class TestFilesystemAnalyzer:
         init_script_paths = [script['path'] for script in self.analyzer.init_scripts]
         assert any('network' in path for path in init_script_paths)
         assert any('rc.local' in path for path in init_script_paths)
+        
+        # Files matching both a name pattern and a shebang are listed once
+        assert len(init_script_paths) == len(set(init_script_paths))
+        rc_local = next(s for s in self.analyzer.init_scripts if s['path'].endswith('rc.local'))
+        assert rc_local['interpreter'] == '/bin/bash'
     
     def test_calculate_directory_sizes(self):
         """Test directory size calculation."""
@@ -147,12 +296,15 @@ class TestFilesystemAnalyzer:
         assert 'init_scripts' in report
         assert 'large_files' in report
         assert 'directory_sizes' in report
+        assert 'bloat' in report
         assert 'mount_info' in report
         
         # Check that values are reasonable
         assert report['total_files'] > 0
         assert report['total_size'] > 0
         assert isinstance(report['total_size_human'], str)
+        assert report['bloat']['old_files'] == 0
+        assert report['bloat']['duplicate_size'] >= 0
     
     def test_analyze_filesystem(self):
         """Test complete filesystem analysis."""
@@ -163,6 +315,26 @@ class TestFilesystemAnalyzer:
         assert 'total_files' in report
         assert report['total_files'] > 0
     
+    def test_progress_callback(self):
+        """Progress messages should cover each phase and scanned directory."""
+        messages = []
+        analyzer = FilesystemAnalyzer(self.temp_dir, progress_callback=messages.append)
+        analyzer.analyze_filesystem()
+        
+        assert messages[0] == "Scanning filesystem..."
+        assert messages[-1] == "Finding large files..."
+        assert f"Scanning {os.path.join(analyzer._root_str, 'etc', 'init.d')}" in messages
+    
+    def test_progress_callback_error(self):
+        """A failing callback should stop every scanner thread, not hang the walk."""
+        def fail(message):
+            if message.startswith("Scanning /"):
+                raise RuntimeError("callback failed")
+        
+        analyzer = FilesystemAnalyzer(self.temp_dir, threads=4, progress_callback=fail)
+        with pytest.raises(RuntimeError, match="callback failed"):
+            analyzer._collect_file_stats()
+    
     def test_mount_info(self):
         """Test mount information retrieval."""
         mount_info = self.analyzer._get_mount_info()
@@ -176,7 +348,7 @@ class TestFilesystemAnalyzer:
         analyzer = FilesystemAnalyzer("/non/existent/path")
         analyzer._collect_file_stats()
         # Should not raise an exception, just collect no files
-        assert len(analyzer.file_stats) == 0
+        assert len(analyzer.paths) == 0
 
 
 class TestFilesystemAnalyzerIntegration:
@@ -224,4 +396,46 @@ class TestFilesystemAnalyzerIntegration:
             # Check directory sizes
             assert str(test_path / "a" / "b" / "c") in analyzer.directory_sizes
             assert str(test_path / "a" / "b") in analyzer.directory_sizes
-            assert str(test_path / "a") in analyzer.directory_sizes 
\ No newline at end of file
+            assert str(test_path / "a") in analyzer.directory_sizes 
+
+
+class TestArrayScans:
+    """Test cases for the numeric scans over the per-file arrays."""
+    
+    def test_top_k_indices(self):
+        """Test selection of the largest sizes."""
+        sizes = np.array([5, 1, 9, 3, 9, 7], dtype=np.int64)
+        
+        assert _top_k_indices(sizes, 3).tolist() == [2, 4, 5]
+        assert _top_k_indices(sizes, 10).tolist() == [2, 4, 5, 0, 3, 1]
+        assert len(_top_k_indices(np.empty(0, dtype=np.int64), 20)) == 0
+    
+    def test_duplicate_waste(self):
+        """Test duplicate detection by size."""
+        sizes = np.array([10, 4, 10, 0, 10, 4, 7], dtype=np.int64)
+        
+        assert _duplicate_waste(sizes) == (2, 10 * 2 + 4)
+        assert _duplicate_waste(np.array([1, 2, 3], dtype=np.int64)) == (0, 0)
+    
+    def test_old_file_stats(self):
+        """Test old file detection by modification time."""
+        mtimes = np.array([100.0, 500.0, 50.0], dtype=np.float64)
+        sizes = np.array([1, 2, 4], dtype=np.int64)
+        
+        assert _old_file_stats(mtimes, sizes, 200.0) == (2, 5)
+        assert _old_file_stats(mtimes, sizes, 10.0) == (0, 0)
+    
+    def test_numba_kernels(self, monkeypatch):
+        """Compiled kernels should agree with the NumPy versions."""
+        pytest.importorskip("numba")
+        rng = np.random.default_rng(0)
+        sizes = rng.integers(0, 50, 500).astype(np.int64)
+        mtimes = rng.random(500) * 1000.0
+        
+        expected = (_top_k_indices(sizes, 20).tolist(), _duplicate_waste(sizes),
+                    _old_file_stats(mtimes, sizes, 500.0))
+        monkeypatch.setattr("efv.analyzer._NUMBA_MIN_FILES", 0)
+        compiled = (_top_k_indices(sizes, 20).tolist(), _duplicate_waste(sizes),
+                    _old_file_stats(mtimes, sizes, 500.0))
+        
+        assert compiled == expected
@@ -0,0 +1,38 @@
+"""
+Unit tests for the EFV command-line interface.
+"""
+
+import csv
+import sys
+import gzip
+import pytest
+from pathlib import Path
+from efv import cli
+
+
+class TestCli:
+    """Test cases for report file handling in the CLI."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_tree(self, rootfs):
+        """Set up test fixtures."""
+        self.temp_dir = rootfs
+    
+    def test_infer_format(self):
+        """The format should follow the file name, ignoring a .gz suffix."""
+        assert cli._infer_format("report.json") == "json"
+        assert cli._infer_format("report.csv.gz") == "csv"
+        assert cli._infer_format("report.json.gz") == "json"
+        assert cli._infer_format("report.txt") == "text"
+        assert cli._infer_format("report.gz") == "text"
+    
+    def test_main_gzip_output(self, monkeypatch):
+        """A .gz output name should produce a compressed report."""
+        output = str(Path(self.temp_dir) / "report.csv.gz")
+        monkeypatch.setattr(sys, "argv", ["efv", self.temp_dir, "-o", output, "--no-cache"])
+        cli.main()
+        
+        with gzip.open(output, "rt", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["path", "size", "mode", "mtime", "uid", "gid"]
+        assert len(rows) == 1 + 3
@@ -0,0 +1,61 @@
+"""
+Unit tests for the EFV report writers.
+"""
+
+import io
+import csv
+import json
+import pytest
+from efv import report
+from efv.analyzer import FilesystemAnalyzer
+
+
+class TestReportWriters:
+    """Test cases for the report file formats."""
+    
+    @pytest.fixture(autouse=True)
+    def setup_analysis(self, rootfs):
+        """Set up test fixtures."""
+        self.temp_dir = rootfs
+        self.analyzer = FilesystemAnalyzer(rootfs)
+        self.report = self.analyzer.analyze_filesystem()
+    
+    def test_text_report(self):
+        """The text report should summarize the analysis."""
+        f = io.BytesIO()
+        report.write_text_report(f, self.temp_dir, self.report)
+        
+        text = f.getvalue().decode("utf-8")
+        assert f"Analyzed path: {self.temp_dir}\n" in text
+        assert "Total files: 3\n" in text
+    
+    def test_json_report(self):
+        """The JSON report should carry the summary of the analysis."""
+        f = io.BytesIO()
+        report.write_json_report(f, self.temp_dir, self.report)
+        
+        data = json.loads(f.getvalue())
+        assert data['metadata']['analyzed_path'] == self.temp_dir
+        assert data['metadata']['total_files'] == 3
+        assert data['metadata']['total_size'] == self.report['total_size']
+    
+    def test_json_report_undecodable_path(self, monkeypatch):
+        """Names that are not valid UTF-8 should be written with either encoder."""
+        path = self.temp_dir + "/bad\udcff"
+        
+        for encoder in (report.orjson, None):
+            monkeypatch.setattr(report, "orjson", encoder)
+            f = io.BytesIO()
+            report.write_json_report(f, path, self.report)
+            assert json.loads(f.getvalue())['metadata']['analyzed_path'] == path
+    
+    def test_csv_report(self):
+        """The CSV report should hold one row per file."""
+        f = io.BytesIO()
+        report.write_csv_report(f, self.analyzer)
+        
+        rows = list(csv.reader(io.StringIO(f.getvalue().decode("utf-8"), newline="")))
+        assert rows[0] == ["path", "size", "mode", "mtime", "uid", "gid"]
+        assert rows[1:] == [
+            [str(value) for value in stat] for stat in self.analyzer.iter_file_stats()
+        ]